@@ -0,0 +1,33 @@
+"""Numba-compiled kernels for hot per-trajectory loops.
+
+Importing this module requires numba; routing.py treats it as an optional
+accelerator and falls back to the vectorized NumPy path when it is missing.
+"""
+
+import math
+
+import numpy as np
+from numba import njit, prange
+
+EARTH_RADIUS_KM = 6371.0
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def segment_speeds(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Per-minute speeds (km/h) from consecutive haversine distances.
+
+    Single fused pass over the coordinate arrays: no intermediate sin/cos
+    temporaries, parallelized across segments.
+    """
+    n = lats.shape[0] - 1
+    speeds = np.empty(n)
+    for i in prange(n):
+        lat1 = math.radians(lats[i])
+        lat2 = math.radians(lats[i + 1])
+        dlat = lat2 - lat1
+        dlon = math.radians(lons[i + 1]) - math.radians(lons[i])
+        a = (math.sin(dlat / 2)**2 +
+             math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2)
+        # Speed in km/h (1 minute = 1/60 hour)
+        speeds[i] = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)) * 60.0
+    return speeds
@@ -4,11 +4,71 @@ import json
 import random
 import os
 import requests
+from requests.adapters import HTTPAdapter, Retry
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Tuple, Dict
-import math
 import geopandas as gpd
+import pyproj
 from shapely.geometry import Point
+from shapely.prepared import prep
+
+try:
+    import orjson
+except ImportError:  # fall back to requests' stdlib json parsing
+    orjson = None
+
+# Optional numba-accelerated kernels; NumPy paths are used when unavailable
+try:
+    from ._numba_kernels import segment_speeds as _segment_speeds_jit
+except ImportError:
+    try:  # routing.py is also imported as a top-level module from notebooks
+        from _numba_kernels import segment_speeds as _segment_speeds_jit
+    except ImportError:
+        _segment_speeds_jit = None
+
+# JIT dispatch threshold: below this the NumPy path wins (no warm-up cost)
+_JIT_MIN_POINTS = 1024
+
+# Nominatim state names -> US state codes, built once at import
+_STATE_MAPPING = {
+    'california': 'CA', 'texas': 'TX', 'florida': 'FL',
+    'new york': 'NY', 'pennsylvania': 'PA', 'illinois': 'IL',
+    'georgia': 'GA', 'massachusetts': 'MA', 'washington': 'DC'
+}
+
+def _parse_json(response: requests.Response) -> Dict:
+    """Parse an API response body; orjson is 2-5x faster on coordinate arrays"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _decode_polyline6(encoded: str) -> np.ndarray:
+    """Decode a Valhalla precision-6 polyline into an (N, 2) [lat, lon] array.
+
+    Vectorized replacement for the character-by-character pure-Python
+    `polyline` package: varint chunks, zigzag deltas and the running sum
+    are all decoded with NumPy in a handful of array passes.
+    """
+    if not encoded:
+        return np.empty((0, 2))
+
+    chunks = np.frombuffer(encoded.encode('ascii'), dtype=np.uint8).astype(np.int64) - 63
+    payload = chunks & 0x1f
+    continues = (chunks & 0x20) != 0
+
+    # A varint starts at position 0 and after every chunk without the continuation bit
+    starts = np.flatnonzero(np.concatenate(([True], ~continues[:-1])))
+    lengths = np.diff(np.concatenate((starts, [len(chunks)])))
+    offsets = np.arange(len(chunks)) - np.repeat(starts, lengths)
+
+    values = np.add.reduceat(payload << (5 * offsets), starts)
+    deltas = np.where(values & 1, ~(values >> 1), values >> 1)
+
+    return np.cumsum(deltas.reshape(-1, 2), axis=0) / 1e6
+
 
 class TruckRouting:
     def __init__(self, metros_file: str = None, osrm_url: str = "https://router.project-osrm.org", 
@@ -21,11 +81,35 @@ class TruckRouting:
         with open(metros_file, 'r') as f:
             self.metros_data = json.load(f)
         self.metros = self.metros_data['metros']
+        # Name-keyed lookups for the hot trajectory-generation path
+        self._metro_coords = {m['name']: (m['lat'], m['lon']) for m in self.metros}
+        self._metro_names = list(self._metro_coords)
         
         self.osrm_url = osrm_url
         self.valhalla_url = valhalla_url
         self.router_type = router_type
-        
+
+        # Pooled HTTP session: reuses TCP/TLS connections across API calls
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10, pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._session.headers.update({'Accept-Encoding': 'gzip'})
+
+        # Shared token for Nominatim's 1 req/s usage policy across worker threads
+        self._nominatim_lock = threading.Lock()
+        self._nominatim_next_call = 0.0
+        # Nominatim results cached on coordinates rounded to ~1 km
+        self._geocode_cache = {}
+        # Raw router responses cached per metro pair (routes are deterministic)
+        self._route_cache = {}
+        # WGS84 geodesic for scalar distances, built on first use
+        self._geod = None
+
         # Load US states GeoJSON for spatial analysis
         if states_geojson is None:
             current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -38,6 +122,14 @@ class TruckRouting:
                 self.states_gdf = self.states_gdf.rename(columns={'NAME': 'STATE_NAME'})
             elif 'name' in self.states_gdf.columns:
                 self.states_gdf = self.states_gdf.rename(columns={'name': 'STATE_NAME'})
+            # Eagerly build the spatial index so the first sjoin doesn't pay for it
+            self.states_gdf.sindex
+            # Cache per-state bounds/names/geometries for the single-point lookup
+            self._state_bboxes = self.states_gdf.geometry.bounds.to_numpy()
+            self._state_names = self.states_gdf['STATE_NAME'].to_numpy()
+            self._state_geoms = self.states_gdf.geometry.values
+            # Prepared geometries pre-index polygon edges for fast repeated contains()
+            self._state_prepared = [prep(geom) for geom in self._state_geoms]
             print(f"Loaded {len(self.states_gdf)} US states for spatial analysis")
         except FileNotFoundError:
             print("US states GeoJSON not found. Please download us_states.geojson to data/ folder")
@@ -63,10 +155,10 @@ class TruckRouting:
                 }
             }
             
-            response = requests.post(url, json=payload, timeout=30)
+            response = self._session.post(url, json=payload, timeout=30)
             response.raise_for_status()
             
-            data = response.json()
+            data = _parse_json(response)
             
             if 'trip' not in data or not data['trip']['legs']:
                 raise ValueError(f"Valhalla didn't find the route: {data}")
@@ -75,8 +167,7 @@ class TruckRouting:
             geometry = leg['shape']
             
             # Decode polyline geometry (Valhalla encodes with precision=6)
-            import polyline
-            route_points = [(lat, lon) for lat, lon in polyline.decode(geometry, 6)]
+            route_points = _decode_polyline6(geometry)
             
             return {
                 'route_points': route_points,
@@ -93,31 +184,36 @@ class TruckRouting:
             print(f"Error in Valhalla call: {e}")
             raise RuntimeError(f"Valhalla routing failed: {e}")
 
-    def get_osrm_route(self, start_lat: float, start_lon: float, 
-                      end_lat: float, end_lon: float) -> Dict:
+    def get_osrm_route(self, start_lat: float, start_lon: float,
+                      end_lat: float, end_lon: float,
+                      overview: str = 'simplified') -> Dict:
         """Get real route from OSRM"""
         try:
-            # OSRM route API call
+            # OSRM route API call. The simplified overview is plenty for
+            # per-minute sampling and is ~5-10x smaller than 'full'; steps
+            # and annotations are never used here
             url = f"{self.osrm_url}/route/v1/driving/{start_lon},{start_lat};{end_lon},{end_lat}"
             params = {
-                'overview': 'full',  # Get all points 
+                'overview': overview,
                 'geometries': 'geojson',
-                'steps': 'true'
+                'steps': 'false',
+                'annotations': 'false'
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = self._session.get(url, params=params, timeout=30)
             response.raise_for_status()
             
-            data = response.json()
+            data = _parse_json(response)
             
             if data['code'] != 'Ok' or not data['routes']:
                 raise ValueError(f"OSRM didn't find the route: {data}")
             
             route = data['routes'][0]
             geometry = route['geometry']['coordinates']
-            
-            # Converting [lon, lat] into [lat, lon]
-            route_points = [(coord[1], coord[0]) for coord in geometry]
+
+            # Converting [lon, lat] into [lat, lon]; contiguous float64 so
+            # downstream math needs no upcast copies
+            route_points = np.asarray(geometry, dtype=np.float64)[:, ::-1].copy()
             
             return {
                 'route_points': route_points,
@@ -133,43 +229,121 @@ class TruckRouting:
         except Exception as e:
             print(f"Error in OSRM call: {e}")
             raise RuntimeError(f"OSRM routing failed: {e}")
-    
-    
+
+    def batch_osrm_table(self, pairs: List[Tuple[Tuple[float, float],
+                                                 Tuple[float, float]]]) -> List[Dict]:
+        """Distances and durations for many coordinate pairs in one OSRM /table call"""
+        try:
+            coords = []
+            for start, end in pairs:
+                coords.append(f"{start[1]},{start[0]}")
+                coords.append(f"{end[1]},{end[0]}")
+
+            # Even positions are sources, odd positions their destinations
+            indices = np.arange(len(pairs)) * 2
+            url = f"{self.osrm_url}/table/v1/driving/{';'.join(coords)}"
+            params = {
+                'sources': ';'.join(map(str, indices)),
+                'destinations': ';'.join(map(str, indices + 1)),
+                'annotations': 'duration,distance'
+            }
+
+            response = self._session.get(url, params=params, timeout=30)
+            response.raise_for_status()
+
+            data = _parse_json(response)
+
+            if data['code'] != 'Ok':
+                raise ValueError(f"OSRM didn't compute the table: {data}")
+
+            results = []
+            for i in range(len(pairs)):
+                distance = data['distances'][i][i]
+                duration = data['durations'][i][i]
+                results.append({
+                    'distance_meters': distance,
+                    'duration_seconds': duration,
+                    'distance_km': distance / 1000,
+                    'duration_hours': duration / 3600
+                })
+            return results
+
+        except requests.exceptions.RequestException as e:
+            print(f"OSRM API error: {e}")
+            raise RuntimeError(f"OSRM API failed: {e}")
+        except Exception as e:
+            print(f"Error in OSRM call: {e}")
+            raise RuntimeError(f"OSRM table failed: {e}")
+
+    def batch_osrm_routes(self, pairs: List[Tuple[Tuple[float, float],
+                                                  Tuple[float, float]]],
+                          max_workers: int = 8) -> List[Dict]:
+        """Full OSRM routes (with geometry) for many pairs via parallel requests"""
+        routes = [None] * len(pairs)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self.get_osrm_route,
+                                start[0], start[1], end[0], end[1]): i
+                for i, (start, end) in enumerate(pairs)
+            }
+            for future in as_completed(futures):
+                routes[futures[future]] = future.result()
+
+        return routes
+
+
+    def _segment_distances(self, route_points: np.ndarray) -> np.ndarray:
+        """Haversine distances (km) between consecutive route points, vectorized"""
+        points = np.radians(np.asarray(route_points, dtype=np.float64))
+        lats, lons = points[:, 0], points[:, 1]
+
+        R = 6371  # Earth radius in km
+        dlat = lats[1:] - lats[:-1]
+        dlon = lons[1:] - lons[:-1]
+        a = np.sin(dlat/2)**2 + np.cos(lats[:-1]) * np.cos(lats[1:]) * np.sin(dlon/2)**2
+        return 2 * R * np.arcsin(np.sqrt(a))
+
     def haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-        """Distance between 2 points in km"""
-        R = 6371
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        dlat, dlon = lat2 - lat1, lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        return 2 * R * math.asin(math.sqrt(a))
+        """Distance between 2 points in km (C-backed WGS84 geodesic)"""
+        if self._geod is None:
+            self._geod = pyproj.Geod(ellps='WGS84')
+        _, _, distance_meters = self._geod.inv(lon1, lat1, lon2, lat2)
+        return distance_meters / 1000
+
+    def pairwise_haversine(self, coordinates: List[Tuple[float, float]]) -> np.ndarray:
+        """N x N great-circle distance matrix in km between (lat, lon) points"""
+        points = np.radians(np.asarray(coordinates, dtype=np.float64))
+        lats, lons = points[:, 0], points[:, 1]
+
+        R = 6371  # Earth radius in km
+        dlat = lats[:, None] - lats[None, :]
+        dlon = lons[:, None] - lons[None, :]
+        a = np.sin(dlat/2)**2 + np.cos(lats)[:, None] * np.cos(lats)[None, :] * np.sin(dlon/2)**2
+        return 2 * R * np.arcsin(np.sqrt(a))
     
-    def interpolate_route(self, start_lat: float, start_lon: float, 
-                         end_lat: float, end_lon: float, 
-                         total_minutes: int) -> List[Tuple[float, float]]:
+    def interpolate_route(self, start_lat: float, start_lon: float,
+                         end_lat: float, end_lon: float,
+                         total_minutes: int) -> np.ndarray:
         """Creating interpolated route with per-minute resolution"""
-        route_points = []
-        for minute in range(total_minutes + 1):
-            ratio = minute / total_minutes if total_minutes > 0 else 0
-            lat = start_lat + (end_lat - start_lat) * ratio
-            lon = start_lon + (end_lon - start_lon) * ratio
-            route_points.append((lat, lon))
-        return route_points
-    
-    def sample_route_to_minutes(self, route_points: List[Tuple[float, float]], 
-                               total_duration_minutes: int) -> List[Tuple[float, float]]:
+        ratios = np.linspace(0, 1, total_minutes + 1)
+        lats = start_lat + (end_lat - start_lat) * ratios
+        lons = start_lon + (end_lon - start_lon) * ratios
+        return np.column_stack([lats, lons])
+
+    def sample_route_to_minutes(self, route_points: List[Tuple[float, float]],
+                               total_duration_minutes: int) -> np.ndarray:
         """Sample route to per-minute resolution"""
+        # No-op for router output, which already arrives as a float64 ndarray
+        route_points = np.asarray(route_points, dtype=np.float64)
         if len(route_points) <= 1:
             return route_points
-        
-        # Linear distribution of minutes per route
-        sampled_points = []
-        for minute in range(total_duration_minutes + 1):
-            ratio = minute / total_duration_minutes if total_duration_minutes > 0 else 0
-            point_idx = int(ratio * (len(route_points) - 1))
-            point_idx = min(point_idx, len(route_points) - 1)
-            sampled_points.append(route_points[point_idx])
-        
-        return sampled_points
+
+        # Linear distribution of minutes per route (integer math avoids
+        # float truncation artifacts at exact index boundaries)
+        minutes = np.arange(total_duration_minutes + 1)
+        indices = minutes * (len(route_points) - 1) // max(total_duration_minutes, 1)
+        return route_points[indices]
     
     def reverse_geocode_state(self, lat: float, lon: float) -> str:
         """Reverse geocoding of states using Nominatim API"""
@@ -186,27 +360,16 @@ class TruckRouting:
                 'User-Agent': 'TruckSimulation/1.0'
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self._session.get(url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _parse_json(response)
             address = data.get('address', {})
             
-            # Try to find a state
-            state = (address.get('state') or 
+            # Try to find a state, mapped to US state codes where known
+            state = (address.get('state') or
                     address.get('country_code', '').upper())
-            
-            # Map to US state codes
-            state_mapping = {
-                'california': 'CA', 'texas': 'TX', 'florida': 'FL',
-                'new york': 'NY', 'pennsylvania': 'PA', 'illinois': 'IL',
-                'georgia': 'GA', 'massachusetts': 'MA', 'washington': 'DC'
-            }
-            
-            if state.lower() in state_mapping:
-                return state_mapping[state.lower()]
-            
-            return state if state else 'UNKNOWN'
+            return _STATE_MAPPING.get(state.lower(), state or 'UNKNOWN')
             
         except Exception as e:
             print(f"Nominatim error for {lat}, {lon}: {e}")
@@ -219,24 +382,22 @@ class TruckRouting:
             avg_speed_kmh = random.uniform(70, 95)
         
         # Find metro region coordinates
-        start_coords = None
-        end_coords = None
-        
-        for metro in self.metros:
-            if metro['name'] == start_metro:
-                start_coords = (metro['lat'], metro['lon'])
-            elif metro['name'] == end_metro:
-                end_coords = (metro['lat'], metro['lon'])
-        
-        if not start_coords or not end_coords:
+        start_coords = self._metro_coords.get(start_metro)
+        end_coords = self._metro_coords.get(end_metro)
+
+        if start_coords is None or end_coords is None:
             raise ValueError(f"Metro region not found: {start_metro} or {end_metro}")
         
-        # Get real route from configured router
-        if self.router_type == "valhalla":
-            route_data = self.get_valhalla_route(*start_coords, *end_coords)
-        else:  # default to OSRM
-            route_data = self.get_osrm_route(*start_coords, *end_coords)
-        
+        # Get real route from configured router; the route between two metro
+        # centers never changes, so repeat pairs skip the API round trip
+        route_data = self._route_cache.get((start_metro, end_metro))
+        if route_data is None:
+            if self.router_type == "valhalla":
+                route_data = self.get_valhalla_route(*start_coords, *end_coords)
+            else:  # default to OSRM
+                route_data = self.get_osrm_route(*start_coords, *end_coords)
+            self._route_cache[(start_metro, end_metro)] = route_data
+
         # Sample route to minutes
         total_minutes = int(route_data['duration_hours'] * 60)
         sampled_route = self.sample_route_to_minutes(
@@ -254,26 +415,51 @@ class TruckRouting:
     
     def get_random_metro_pair(self) -> Tuple[str, str]:
         """Get random pair of metro regions"""
-        metros = [metro['name'] for metro in self.metros]
-        start, end = random.sample(metros, 2)
+        start, end = random.sample(self._metro_names, 2)
         return start, end
-    
+
     def get_all_metro_names(self) -> List[str]:
         """Get list of all metro regions"""
-        return [metro['name'] for metro in self.metros]
+        return list(self._metro_names)
     
-    def batch_reverse_geocode(self, coordinates: List[Tuple[float, float]], 
-                            delay: float = 1.0) -> List[str]:
-        """Batch reverse geocoding with rate limiting"""
-        states = []
-        for i, (lat, lon) in enumerate(coordinates):
-            if i > 0 and i % 10 == 0:
-                print(f"Reverse geocoding progress: {i}/{len(coordinates)}")
-                time.sleep(delay)  # Rate limiting
-            
-            state = self.reverse_geocode_state(lat, lon)
-            states.append(state)
-        
+    def _reverse_geocode_rate_limited(self, lat: float, lon: float, delay: float) -> str:
+        """Reverse geocode one point, waiting on the shared Nominatim rate limit"""
+        with self._nominatim_lock:
+            wait = self._nominatim_next_call - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._nominatim_next_call = time.monotonic() + delay
+        return self.reverse_geocode_state(lat, lon)
+
+    def batch_reverse_geocode(self, coordinates: List[Tuple[float, float]],
+                            delay: float = 1.0, max_workers: int = 8) -> List[str]:
+        """Batch reverse geocoding: local spatial join first, Nominatim as fallback"""
+        # The states layer answers any point inside the US without a network call
+        states = self.batch_spatial_analysis(coordinates)
+        unresolved = [i for i, state in enumerate(states) if state == 'UNKNOWN']
+        if not unresolved:
+            return states
+
+        # Nominatim at zoom=3 is coarse, so cache on coordinates rounded to ~1 km
+        keys = {i: (round(coordinates[i][0], 2), round(coordinates[i][1], 2))
+                for i in unresolved}
+        pending = {key for key in keys.values() if key not in self._geocode_cache}
+
+        # Worker threads overlap HTTP latency; the shared token keeps the
+        # request rate at one Nominatim call per `delay` seconds
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._reverse_geocode_rate_limited, lat, lon, delay): (lat, lon)
+                for lat, lon in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                self._geocode_cache[futures[future]] = future.result()
+                if done % 10 == 0:
+                    print(f"Reverse geocoding progress: {done}/{len(futures)}")
+
+        for i in unresolved:
+            states[i] = self._geocode_cache[keys[i]]
+
         return states
     
     def get_state_for_coordinates(self, lat: float, lon: float) -> str:
@@ -282,58 +468,63 @@ class TruckRouting:
             return 'UNKNOWN'
         
         point = Point(lon, lat)
-        
-        # Find which state contains this point
-        for idx, row in self.states_gdf.iterrows():
-            if row.geometry.contains(point):
-                return row.get('STATE_NAME', 'UNKNOWN')
-        
+
+        # Vectorized bounding-box prefilter: only a handful of states survive
+        bboxes = self._state_bboxes
+        mask = ((bboxes[:, 0] <= lon) & (bboxes[:, 2] >= lon) &
+                (bboxes[:, 1] <= lat) & (bboxes[:, 3] >= lat))
+
+        # Full containment test only on the bbox candidates
+        for idx in np.where(mask)[0]:
+            if self._state_prepared[idx].contains(point):
+                return self._state_names[idx]
+
         return 'UNKNOWN'
     
     def batch_spatial_analysis(self, coordinates: List[Tuple[float, float]]) -> List[str]:
         """Batch spatial analysis for all coordinates using shapefile"""
-        if self.states_gdf is None:
+        if self.states_gdf is None or len(coordinates) == 0:
             return ['UNKNOWN'] * len(coordinates)
-        
-        states = []
-        for lat, lon in coordinates:
-            state = self.get_state_for_coordinates(lat, lon)
-            states.append(state)
-        
-        return states
+
+        coords = np.asarray(coordinates, dtype=np.float64)
+        points_gdf = gpd.GeoDataFrame(
+            geometry=gpd.points_from_xy(coords[:, 1], coords[:, 0]),
+            crs=self.states_gdf.crs
+        )
+
+        # One indexed spatial join instead of a per-point containment loop
+        joined = points_gdf.sjoin(
+            self.states_gdf[['STATE_NAME', 'geometry']],
+            how='left', predicate='within'
+        )
+        # A point on a shared border can match twice; keep the first match
+        joined = joined[~joined.index.duplicated(keep='first')]
+
+        return joined['STATE_NAME'].fillna('UNKNOWN').tolist()
     
-    def calculate_per_minute_speeds(self, trajectory: Dict) -> List[float]:
+    def calculate_per_minute_speeds(self, trajectory: Dict) -> np.ndarray:
         """Calculate per-minute speeds for a trajectory"""
-        route_points = trajectory['route_points']
-        speeds = []
-        
-        for i in range(len(route_points) - 1):
-            lat1, lon1 = route_points[i]
-            lat2, lon2 = route_points[i + 1]
-            
-            # Haversine distance calculation
-            R = 6371  # Earth radius in km
-            lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-            dlat, dlon = lat2 - lat1, lon2 - lon1
-            a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-            distance_km = 2 * R * math.asin(math.sqrt(a))
-            
-            # Speed in km/h (1 minute = 1/60 hour)
-            speed_kmh = distance_km * 60
-            speeds.append(speed_kmh)
-        
-        return speeds
+        route_points = np.asarray(trajectory['route_points'], dtype=np.float64)
+        if len(route_points) < 2:
+            return np.empty(0)
+
+        if _segment_speeds_jit is not None and len(route_points) > _JIT_MIN_POINTS:
+            return _segment_speeds_jit(np.ascontiguousarray(route_points[:, 0]),
+                                       np.ascontiguousarray(route_points[:, 1]))
+
+        # Speed in km/h (1 minute = 1/60 hour)
+        return self._segment_distances(route_points) * 60
     
-    def calculate_rolling_mean_speeds(self, speeds: List[float], window: int = 5) -> List[float]:
+    def calculate_rolling_mean_speeds(self, speeds: List[float], window: int = 5) -> np.ndarray:
         """Calculate rolling mean speeds with specified window"""
+        speeds = np.asarray(speeds, dtype=np.float64)
         if len(speeds) < window:
             return speeds
-        
-        rolling_means = []
-        for i in range(len(speeds)):
-            start_idx = max(0, i - window // 2)
-            end_idx = min(len(speeds), i + window // 2 + 1)
-            window_speeds = speeds[start_idx:end_idx]
-            rolling_means.append(sum(window_speeds) / len(window_speeds))
-        
-        return rolling_means
+
+        # Centered window means via prefix sums: O(N) instead of O(N*window)
+        positions = np.arange(len(speeds))
+        starts = np.maximum(0, positions - window // 2)
+        ends = np.minimum(len(speeds), positions + window // 2 + 1)
+
+        cumulative = np.concatenate(([0.0], np.cumsum(speeds)))
+        return (cumulative[ends] - cumulative[starts]) / (ends - starts)